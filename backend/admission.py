@@ -0,0 +1,127 @@
+import asyncio
+import json
+import math
+import random
+import threading
+import time
+
+class RouteLimit:
+    """
+    Per-route admission settings (per worker).
+    max_concurrent: requests allowed to run at once
+    max_queue:      requests allowed to wait for a slot; beyond that, reject at once
+    max_wait:       seconds a queued request waits before being told to retry
+    """
+    def __init__(self, max_concurrent, max_queue, max_wait=5.0):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self.waiting = 0
+        # EWMA of how long a request holds a slot, used for the Retry-After hint
+        self.avg_seconds = 0.05
+        self._semaphore = None
+
+    @property
+    def semaphore(self):
+        # Created lazily so it binds to the server's event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+        return self._semaphore
+
+    def retry_after(self):
+        # Time to drain the current queue, with jitter so rejected clients don't return in lockstep
+        drain = (self.waiting + 1) * self.avg_seconds / self.max_concurrent
+        return max(1, math.ceil(drain * random.uniform(1.0, 1.5)))
+
+    def record(self, seconds):
+        self.avg_seconds = 0.9 * self.avg_seconds + 0.1 * seconds
+
+class AdmissionMiddleware:
+    """
+    ASGI middleware that caps concurrency per route prefix. Queued requests wait
+    on the event loop (not a worker thread), and a full queue or an expired wait
+    gets a 503 with Retry-After instead of a slow timeout.
+    """
+    def __init__(self, app, limits):
+        self.app = app
+        self.limits = limits  # {path_prefix: RouteLimit}
+
+    def _limit_for(self, path):
+        for prefix, limit in self.limits.items():
+            if path.startswith(prefix):
+                return limit
+        return None
+
+    async def __call__(self, scope, receive, send):
+        limit = self._limit_for(scope["path"]) if scope["type"] == "http" else None
+        if limit is None or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        if limit.waiting >= limit.max_queue:
+            await self._reject(limit, send)
+            return
+
+        limit.waiting += 1
+        try:
+            await asyncio.wait_for(limit.semaphore.acquire(), timeout=limit.max_wait)
+        except asyncio.TimeoutError:
+            await self._reject(limit, send)
+            return
+        finally:
+            limit.waiting -= 1
+
+        start = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limit.record(time.monotonic() - start)
+            limit.semaphore.release()
+
+    async def _reject(self, limit, send):
+        retry_after = limit.retry_after()
+        body = json.dumps({"detail": "Server busy, please retry", "retry_after": retry_after}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(retry_after).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one: the first caller runs
+    the function and everyone who arrives while it is running gets its result.
+    Nothing is cached once the call finishes.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}  # key -> [done event, result, exception]
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = [threading.Event(), None, None]
+
+        if not leader:
+            call[0].wait()
+            if call[2] is not None:
+                raise call[2]
+            return call[1]
+
+        try:
+            call[1] = fn()
+            return call[1]
+        except Exception as e:
+            call[2] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call[0].set()
@@ -0,0 +1,71 @@
+import http.client
+import json
+import os
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+
+from bench_workers import wait_until_up
+
+PORT = 8767
+
+def one_request(method, path, body, out):
+    start = time.perf_counter()
+    try:
+        conn = http.client.HTTPConnection("127.0.0.1", PORT, timeout=60)
+        headers = {"Content-Type": "application/json"} if body else {}
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        data = response.read()
+        status = response.status
+        locked = b"database is locked" in data
+    except OSError as e:
+        status, locked = type(e).__name__, False
+    out.append((status, time.perf_counter() - start, locked))
+
+def burst(method, path, body, clients):
+    """
+    Fires `clients` requests at once (one thread and connection each) and
+    summarises status codes and latency.
+    """
+    out = []
+    threads = [threading.Thread(target=one_request, args=(method, path, body, out)) for _ in range(clients)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    latencies = sorted(l for _, l, _ in out)
+    pct = lambda p: round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 1)
+    return {
+        "clients": clients,
+        "statuses": dict(Counter(str(s) for s, _, _ in out)),
+        "database_locked": sum(1 for _, _, locked in out if locked),
+        "p50_ms": pct(0.50),
+        "p99_ms": pct(0.99),
+        "max_ms": round(latencies[-1] * 1000, 1),
+    }
+
+if __name__ == "__main__":
+    # Usage: python bench_burst.py [clients per burst] [workers]
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    workers = sys.argv[2] if len(sys.argv) > 2 else "1"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(PORT),
+         "--workers", workers, "--log-level", "warning"],
+        start_new_session=True
+    )
+    try:
+        wait_until_up(PORT)
+        results = {
+            "/api/questions": burst("GET", "/api/questions?subject=Full%20NEET&duration=10800", None, clients),
+            "/api/start-test": burst("POST", "/api/start-test",
+                                     json.dumps({"duration": 10800, "subject": "Full NEET"}), clients),
+        }
+        print(json.dumps(results, indent=2))
+    finally:
+        os.killpg(server.pid, signal.SIGTERM)
+        server.wait()
@@ -0,0 +1,70 @@
+import json
+import sys
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+import main
+
+FLUSH_SECONDS = 30 # matches EVENT_FLUSH_MS in the frontend
+
+def count_commits(fn):
+    commits = []
+    listener = lambda session: commits.append(1)
+    event.listen(Session, "after_commit", listener)
+    try:
+        start = time.perf_counter()
+        fn()
+        seconds = time.perf_counter() - start
+    finally:
+        event.remove(Session, "after_commit", listener)
+    return len(commits), seconds
+
+def simulate(client, candidates, clicks, click_interval):
+    """
+    Replays `clicks` navigation events per candidate (one every `click_interval`
+    seconds of client time, ending now) through the single-event endpoint and
+    through 30-second batches, and reports commits for each.
+    """
+    sessions = [
+        client.post("/api/start-test", json={"duration": 10800, "subject": "Physics"}).json()["session_id"]
+        for _ in range(candidates)
+    ]
+    now = time.time()
+    timeline = [now - (clicks - i) * click_interval for i in range(clicks)]
+
+    def single():
+        for session_id in sessions:
+            for i in range(clicks):
+                client.post("/api/update-question-index", params={"session_id": session_id, "new_index": i % 200})
+
+    def batched():
+        for session_id in sessions:
+            batch, batch_start = [], timeline[0]
+            for i, ts in enumerate(timeline):
+                if ts - batch_start >= FLUSH_SECONDS:
+                    client.post("/api/session-events", json={"session_id": session_id, "sent_at": ts, "events": batch})
+                    batch, batch_start = [], ts
+                batch.append({"type": "navigate", "client_ts": ts, "index": i % 200})
+            client.post("/api/session-events", json={"session_id": session_id, "sent_at": time.time(), "events": batch})
+
+    single_commits, single_seconds = count_commits(single)
+    batch_commits, batch_seconds = count_commits(batched)
+    return {
+        "candidates": candidates,
+        "clicks_per_candidate": clicks,
+        "click_interval_s": click_interval,
+        "single_event": {"commits": single_commits, "seconds": round(single_seconds, 2)},
+        "batched": {"commits": batch_commits, "seconds": round(batch_seconds, 2)},
+        "commit_reduction": round(single_commits / max(batch_commits, 1), 1),
+    }
+
+if __name__ == "__main__":
+    # Usage: python bench_events.py [candidates] [clicks per candidate] [seconds between clicks]
+    candidates = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    clicks = int(sys.argv[2]) if len(sys.argv) > 2 else 400
+    interval = float(sys.argv[3]) if len(sys.argv) > 3 else 2.0
+    with TestClient(main.app) as client:
+        print(json.dumps(simulate(client, candidates, clicks, interval), indent=2))
@@ -0,0 +1,57 @@
+import json
+import subprocess
+import sys
+import time
+
+def measure_import(module="main", top=10):
+    """
+    Runs `python -X importtime -c "import <module>"` in a fresh interpreter and
+    summarises the output: total import time plus the slowest top-level imports.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    # Lines look like: "import time:       self |  cumulative | <indent>package",
+    # with two spaces of indent per nesting level
+    total_us = 0
+    direct = []
+    lines = [l for l in result.stderr.splitlines() if l.startswith("import time:")]
+    for line in lines[1:]:
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0 and name.strip() == module:
+            total_us = int(cumulative_us)
+        elif depth == 1:
+            # Imported directly by the module being measured
+            direct.append((name.strip(), int(cumulative_us)))
+
+    slowest = sorted(direct, key=lambda e: e[1], reverse=True)[:top]
+    return {
+        "metric": "import_time",
+        "module": module,
+        "total_ms": round(total_us / 1000, 1),
+        "modules_loaded": len(lines) - 1,
+        "slowest": [{"module": name, "ms": round(us / 1000, 1)} for name, us in slowest],
+    }
+
+if __name__ == "__main__":
+    # Usage: python bench_import.py [module] [--record metrics.jsonl]
+    args = sys.argv[1:]
+    record_path = None
+    if "--record" in args:
+        i = args.index("--record")
+        record_path = args[i + 1]
+        del args[i:i + 2]
+    module = args[0] if args else "main"
+
+    summary = measure_import(module)
+    print(json.dumps(summary, indent=2))
+
+    if record_path:
+        # One JSON line per run so the metric can be tracked over time
+        with open(record_path, "a") as f:
+            f.write(json.dumps({"timestamp": int(time.time()), **summary}) + "\n")
@@ -0,0 +1,36 @@
+import json
+import os
+import sys
+import tempfile
+
+from bench_snapshot import write_text_bank
+from question_lint import lint_folder
+
+def main(count):
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = os.path.join(tmp, "previousyear")
+        os.makedirs(folder)
+        bank_path = os.path.join(folder, "2099.txt")
+        write_text_bank(bank_path, count)
+        cache_path = os.path.join(tmp, "lint_cache.pickle")
+
+        cold = lint_folder(folder, cache_path)["summary"]
+        warm = lint_folder(folder, cache_path)["summary"]
+
+        # Break one answer, as if someone was fixing a single question
+        with open(bank_path, "r+", encoding="utf-8") as f:
+            content = f.read().replace("Answer: A\n", "Answer: E\n", 1)
+            f.seek(0)
+            f.write(content)
+        edited = lint_folder(folder, cache_path)["summary"]
+
+        print(json.dumps({
+            "blocks": count,
+            "cold": {k: cold[k] for k in ("parsed", "cached", "errors", "seconds")},
+            "warm": {k: warm[k] for k in ("parsed", "cached", "errors", "seconds")},
+            "one_block_edited": {k: edited[k] for k in ("parsed", "cached", "errors", "seconds")},
+        }, indent=2))
+
+if __name__ == "__main__":
+    # Usage: python bench_lint.py [block_count]   (default 1000000)
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
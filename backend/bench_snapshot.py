@@ -0,0 +1,122 @@
+import json
+import os
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+SUBJECTS = ["Physics", "Chemistry", "Biology"]
+
+def write_text_bank(path, count):
+    """
+    Writes `count` synthetic questions in the previousyear/*.txt format.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(count):
+            f.write(
+                f"[ID: 2099-{i}]\n"
+                f"Subject: {SUBJECTS[i % 3]}\n"
+                f"Question: Synthetic question number {i} about a body moving with uniform acceleration?\n"
+                f"A. {i} m/s\nB. {i + 1} m/s\nC. {i + 2} m/s\nD. {i + 3} m/s\n"
+                f"Answer: {'ABCD'[i % 4]}\n\n"
+            )
+
+def parse_text_bank(path):
+    # Same splitting as question_loader.load_questions_from_text, minus the database
+    from question_loader import parse_block
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    bank = []
+    for block in re.split(r"\[ID:", content):
+        if "]" not in block:
+            continue
+        closing = block.find("]")
+        parsed = parse_block(block[closing + 1:], 2099)
+        if parsed:
+            parsed["id"] = len(bank) + 1
+            parsed["source_id"] = block[:closing].strip()
+            bank.append(parsed)
+    return bank
+
+def run_text(path):
+    start = time.perf_counter()
+    bank = parse_text_bank(path)
+    return bank, time.perf_counter() - start
+
+def run_snapshot(path):
+    from question_snapshot import QuestionSnapshot
+    start = time.perf_counter()
+    snap = QuestionSnapshot(path)
+    # Include serving one full paper so the load is not just an mmap call
+    for subject in SUBJECTS:
+        snap.sample(subject, 100)
+    return snap, time.perf_counter() - start
+
+def measure(mode, path):
+    """
+    Runs one load path in a fresh interpreter and reports time and peak RSS.
+    """
+    out = subprocess.run(
+        [sys.executable, __file__, "--child", mode, path],
+        capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+def memory_kb():
+    """
+    Returns (peak RSS, anonymous RSS) in KiB. ru_maxrss survives exec on Linux and
+    would report the parent's peak, so /proc is preferred when available.
+    Mapped snapshot pages are shared page cache, which RssAnon leaves out.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            status = {line.split(":")[0]: line.split()[1] for line in f if line.startswith(("VmHWM:", "RssAnon:"))}
+        return int(status["VmHWM"]), int(status["RssAnon"])
+    except (OSError, KeyError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak, peak
+
+def child(mode, path):
+    # Import both paths up front so the memory baseline is the same for each mode
+    import question_loader, question_snapshot  # noqa: F401
+    _, baseline_anon_kb = memory_kb()
+    # Hold on to the loaded bank while measuring, as a server would
+    bank, seconds = run_text(path) if mode == "text" else run_snapshot(path)
+    peak_kb, anon_kb = memory_kb()
+    count = len(bank)
+    print(json.dumps({
+        "mode": mode,
+        "questions": count,
+        "load_seconds": round(seconds, 3),
+        "peak_rss_mb": round(peak_kb / 1024, 1),
+        "anon_rss_growth_mb": round((anon_kb - baseline_anon_kb) / 1024, 1),
+    }))
+
+def main(count):
+    from question_snapshot import write_snapshot
+    with tempfile.TemporaryDirectory() as tmp:
+        text_path = os.path.join(tmp, "bank.txt")
+        snap_path = os.path.join(tmp, "bank.qbs")
+        write_text_bank(text_path, count)
+
+        start = time.perf_counter()
+        write_snapshot(snap_path, parse_text_bank(text_path))
+        export_seconds = time.perf_counter() - start
+
+        results = [measure("text", text_path), measure("snapshot", snap_path)]
+        print(json.dumps({
+            "questions": count,
+            "text_bytes": os.path.getsize(text_path),
+            "snapshot_bytes": os.path.getsize(snap_path),
+            "export_seconds": round(export_seconds, 3),
+            "results": results,
+        }, indent=2))
+
+if __name__ == "__main__":
+    # Usage: python bench_snapshot.py [question_count]   (default 500000)
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3])
+    else:
+        main(int(sys.argv[1]) if len(sys.argv) > 1 else 500000)
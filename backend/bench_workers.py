@@ -0,0 +1,82 @@
+import http.client
+import json
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import time
+
+PORT = 8765
+ENDPOINTS = ["/api/test-status/{session_id}", "/api/questions?subject=Physics"]
+
+def wait_until_up(port, timeout=30):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/")
+            conn.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("server did not start")
+
+def client(port, path, seconds, results):
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    done = errors = 0
+    deadline = time.time() + seconds
+    while time.time() < deadline:
+        conn.request("GET", path)
+        response = conn.getresponse()
+        response.read()
+        if response.status == 200:
+            done += 1
+        else:
+            errors += 1
+    results.put((done, errors))
+
+def run_load(port, path, clients, seconds):
+    results = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=client, args=(port, path, seconds, results)) for _ in range(clients)]
+    for p in procs:
+        p.start()
+    totals = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return sum(t[0] for t in totals) / seconds, sum(t[1] for t in totals)
+
+def bench(workers, clients, seconds):
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(PORT),
+         "--workers", str(workers), "--log-level", "warning"],
+        start_new_session=True
+    )
+    try:
+        wait_until_up(PORT)
+        conn = http.client.HTTPConnection("127.0.0.1", PORT)
+        conn.request("POST", "/api/start-test", body=json.dumps({"duration": 3600, "subject": "Physics"}),
+                     headers={"Content-Type": "application/json"})
+        session_id = json.loads(conn.getresponse().read())["session_id"]
+
+        row = {"workers": workers}
+        for endpoint in ENDPOINTS:
+            path = endpoint.format(session_id=session_id)
+            rps, errors = run_load(PORT, path, clients, seconds)
+            row[endpoint.split("?")[0].split("/{")[0]] = {"rps": round(rps, 1), "errors": errors}
+        return row
+    finally:
+        os.killpg(server.pid, signal.SIGTERM)
+        server.wait()
+
+if __name__ == "__main__":
+    # Usage: python bench_workers.py [seconds per endpoint] [client processes]
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    clients = int(sys.argv[2]) if len(sys.argv) > 2 else 16
+    rows = [bench(n, clients, seconds) for n in (1, 2, 4, 8)]
+    base = rows[0]
+    for row in rows:
+        for key, value in row.items():
+            if key != "workers":
+                value["scaling"] = round(value["rps"] / max(base[key]["rps"], 1e-9), 2)
+    print(json.dumps({"cpus": os.cpu_count(), "clients": clients, "results": rows}, indent=2))
@@ -1,12 +1,39 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 SQLALCHEMY_DATABASE_URL = "sqlite:///./neet.db"
 
 engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
+    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False, "timeout": 30}
 )
+
+@event.listens_for(engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers run alongside a writer, and busy_timeout makes writers wait
+    # for the lock instead of failing with "database is locked" under bursts
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA busy_timeout=30000")
+    cursor.close()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
+
+_schema_ready = False
+
+def init_db():
+    """
+    One-time schema setup. Runs at app startup (or via `python database.py`)
+    instead of at import time, so importing the app stays cheap.
+    """
+    global _schema_ready
+    if _schema_ready:
+        return
+    import models  # noqa: F401  (registers tables on Base)
+    Base.metadata.create_all(bind=engine)
+    _schema_ready = True
+
+if __name__ == "__main__":
+    init_db()
+    print("Database schema is up to date.")
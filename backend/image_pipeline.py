@@ -0,0 +1,173 @@
+import hashlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Pillow is imported inside the build functions only; serving just reads the manifest.
+IMAGE_FOLDER = "static/images"
+IMAGE_URL_PREFIX = "/static/images/"
+MANIFEST_PATH = "image_derivatives.json"
+
+# Fixed widths served to clients; sources narrower than a width are not upscaled
+WIDTHS = (320, 640, 1024)
+# Preferred format first
+FORMATS = ("avif", "webp")
+MIME_TYPES = {"avif": "image/avif", "webp": "image/webp"}
+QUALITY = {"avif": 55, "webp": 75}
+
+_manifest_lock = threading.Lock()
+_manifest_cache = {"mtime": None, "data": {}}
+
+def _content_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:10]
+
+def _derivative_name(stem, digest, width, fmt):
+    # The content hash makes each derivative URL immutable, so it can be cached forever
+    return f"{stem}.{digest}.{width}w.{fmt}"
+
+def available_formats():
+    # AVIF is skipped when Pillow is built without it
+    from PIL import features
+    return [fmt for fmt in FORMATS if features.check(fmt)]
+
+def _encode(src_path, dest_path, width, fmt):
+    from PIL import Image
+    with Image.open(src_path) as img:
+        if img.mode not in ("RGB", "RGBA"):
+            # LA/PA/P-with-transparency etc. keep their alpha; everything else drops to RGB
+            has_alpha = "transparency" in img.info or "A" in img.getbands() or img.mode in ("LA", "PA")
+            img = img.convert("RGBA" if has_alpha else "RGB")
+        if img.width > width:
+            height = round(img.height * width / img.width)
+            img = img.resize((width, height), Image.LANCZOS)
+        img.save(dest_path, format=fmt.upper(), quality=QUALITY[fmt])
+
+def plan_derivatives(src_path):
+    """
+    Returns the (width, format, dest_path) jobs needed for one source image.
+    """
+    from PIL import Image
+    with Image.open(src_path) as img:
+        src_width = img.width
+
+    # Fixed widths below the source, then the source's own width (capped) as the top
+    # variant, so a browser never upscales a smaller derivative into a wider slot
+    top = min(src_width, WIDTHS[-1])
+    widths = [w for w in WIDTHS if w < top] + [top]
+    stem = os.path.splitext(os.path.basename(src_path))[0]
+    digest = _content_hash(src_path)
+    folder = os.path.dirname(src_path)
+    return [
+        (w, fmt, os.path.join(folder, _derivative_name(stem, digest, w, fmt)))
+        for fmt in available_formats()
+        for w in widths
+    ]
+
+def build_derivatives(src_paths, max_workers=None):
+    """
+    Encodes resized WebP/AVIF variants for the given images in parallel and
+    records them in the manifest. Returns {image_url: {mime_type: srcset}}.
+    """
+    jobs = []
+    for src in src_paths:
+        try:
+            for width, fmt, dest in plan_derivatives(src):
+                jobs.append((src, width, fmt, dest))
+        except OSError as e:
+            print(f"Skipping unreadable image {src}: {e}")
+
+    def run(job):
+        src, width, fmt, dest = job
+        if not os.path.exists(dest):
+            try:
+                _encode(src, dest, width, fmt)
+            except Exception as e:
+                # One bad image must not abort the whole build; it just gets no derivative
+                print(f"Could not encode {src} as {width}w {fmt}: {e}")
+                if os.path.exists(dest):
+                    os.remove(dest)
+                return None
+        return job
+
+    entries = {}
+    # Pillow releases the GIL while resizing and encoding, so threads scale here
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for job in pool.map(run, jobs):
+            if job is None:
+                continue
+            src, width, fmt, dest = job
+            url = IMAGE_URL_PREFIX + os.path.basename(src)
+            entries.setdefault(url, {}).setdefault(fmt, []).append(
+                (width, IMAGE_URL_PREFIX + os.path.basename(dest))
+            )
+
+    result = {
+        url: {
+            MIME_TYPES[fmt]: ", ".join(f"{d_url} {w}w" for w, d_url in sorted(variants))
+            for fmt, variants in by_fmt.items()
+        }
+        for url, by_fmt in entries.items()
+    }
+    _update_manifest(result)
+    return result
+
+def _update_manifest(entries):
+    if not entries:
+        return
+    with _manifest_lock:
+        data = {}
+        if os.path.exists(MANIFEST_PATH):
+            with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        data.update(entries)
+        tmp_path = MANIFEST_PATH + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, MANIFEST_PATH)
+
+def _load_manifest():
+    try:
+        mtime = os.path.getmtime(MANIFEST_PATH)
+    except OSError:
+        return {}
+    with _manifest_lock:
+        if _manifest_cache["mtime"] != mtime:
+            with open(MANIFEST_PATH, "r", encoding="utf-8") as f:
+                _manifest_cache["data"] = json.load(f)
+            _manifest_cache["mtime"] = mtime
+        return _manifest_cache["data"]
+
+def srcset_for(image_path):
+    """
+    Maps a stored image_path to {mime_type: "url 320w, url 640w, ..."}, or None
+    if no derivatives were built for it.
+    """
+    if not image_path:
+        return None
+    return _load_manifest().get(image_path)
+
+def is_derivative(filename):
+    # e.g. 2022_Physics_p3_i0.ab12cd34ef.640w.webp
+    parts = filename.rsplit(".", 3)
+    return len(parts) == 4 and parts[3] in MIME_TYPES and parts[2].endswith("w")
+
+def build_all():
+    """
+    (Re)builds derivatives for every original image in the image folder.
+    """
+    if not os.path.exists(IMAGE_FOLDER):
+        print(f"Folder {IMAGE_FOLDER} not found.")
+        return {}
+    sources = [
+        os.path.join(IMAGE_FOLDER, name)
+        for name in sorted(os.listdir(IMAGE_FOLDER))
+        if not is_derivative(name)
+    ]
+    result = build_derivatives(sources)
+    print(f"Built derivatives for {len(result)} of {len(sources)} images ({', '.join(available_formats())})")
+    return result
+
+if __name__ == "__main__":
+    build_all()
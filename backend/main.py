@@ -2,28 +2,53 @@ from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
-from sqlalchemy.sql.expression import func
-from database import engine, SessionLocal, Base
+from contextlib import asynccontextmanager
+from database import SessionLocal, init_db
 import models
+import question_cache
+import image_pipeline
+import shared_state
+from admission import AdmissionMiddleware, RouteLimit, SingleFlight
 import os
-from typing import List, Optional
-from question_loader import load_questions_from_text
+import threading
+from typing import Dict, List, Optional
 
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
     FRONTEND_URL: str = "https://nee-tmock.vercel.app/"
     DATABASE_URL: str = "sqlite:///./neet.db"
+    # Snapshot written by `python question_snapshot.py export`; when set, questions are served from it
+    QUESTION_SNAPSHOT: Optional[str] = None
+    # Where per-worker state is shared (see shared_state.py); unix:// suits N workers on one box
+    SHARED_STATE_URL: str = shared_state.DEFAULT_URL
 
     class Config:
         env_file = ".env"
 
 settings = Settings()
 
-# Create database tables
-models.Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app):
+    # Schema and folders are set up once per process here rather than at import time,
+    # so a cold instance only pays for what serving needs.
+    init_db()
+    os.makedirs("static/images", exist_ok=True)
+    shared_state.configure(settings.SHARED_STATE_URL)
+    if settings.QUESTION_SNAPSHOT:
+        question_cache.use_snapshot(settings.QUESTION_SNAPSHOT)
+    # Warm question caches without blocking the first request
+    threading.Thread(target=question_cache.warm_up, args=(SessionLocal,), daemon=True).start()
+    yield
 
-app = FastAPI(title="ESHA's NEET 2026")
+app = FastAPI(title="ESHA's NEET 2026", lifespan=lifespan)
+
+# Admission control for exam-start stampedes (limits are per worker).
+# Added before CORS so CORS stays outermost and 503s still carry CORS headers.
+app.add_middleware(AdmissionMiddleware, limits={
+    "/api/questions": RouteLimit(max_concurrent=8, max_queue=500, max_wait=5.0),
+    "/api/start-test": RouteLimit(max_concurrent=2, max_queue=1000, max_wait=5.0),
+})
 
 # CORS Middleware
 origins = [
@@ -38,11 +63,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After"],
 )
 
-# Mount static directory for images
-os.makedirs("static/images", exist_ok=True)
-app.mount("/static", StaticFiles(directory="static"), name="static")
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles already sends ETag/Last-Modified; this adds Cache-Control.
+    Derivatives have a content hash in their name, so they never change.
+    """
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if image_pipeline.is_derivative(os.path.basename(full_path)):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        else:
+            response.headers["Cache-Control"] = "public, max-age=86400"
+        return response
+
+# Mount static directory for images (created on startup)
+app.mount("/static", CachedStaticFiles(directory="static", check_dir=False), name="static")
 
 def get_db():
     db = SessionLocal()
@@ -55,9 +93,21 @@ def get_db():
 def read_root():
     return {"message": "Welcome to ESHA's NEET 2026 API"}
 
+def require_database_bank():
+    # Writes go to neet.db, which a snapshot-backed server never reads
+    if question_cache.serving_snapshot():
+        raise HTTPException(
+            status_code=409,
+            detail="Questions are served from QUESTION_SNAPSHOT; change the database, re-export the snapshot and restart"
+        )
+
 @app.post("/api/load-questions")
 def trigger_loading(background_tasks: BackgroundTasks):
+    require_database_bank()
+    # Parsers are imported lazily; the request path never needs them
+    from question_loader import load_questions_from_text
     background_tasks.add_task(load_questions_from_text)
+    background_tasks.add_task(question_cache.invalidate)
     return {"message": "Question loading started in background"}
 
 from rank_predictor import predict_rank
@@ -86,8 +136,42 @@ class TestStatusResponse(BaseModel):
     remaining_question_seconds: float
     is_active: bool
 
-# In-memory store for active sessions (for simplicity, or use DB if you prefer persistence across server restarts)
-# BUT user asked for DB model, so let's use the DB model `TestSession`.
+# The DB model `TestSession` is the source of truth. Timer fields are mirrored in the
+# shared state store so status polls from any worker don't hit SQLite.
+
+def cache_session(session):
+    state = {
+        "id": session.id,
+        "end_time": session.end_time,
+        "current_question_id": session.current_question_id,
+        "question_start_time": session.question_start_time,
+    }
+    # Keep it around a while after the exam ends for late status polls
+    ttl = max(0, int(session.end_time - time.time())) + 3600
+    store = shared_state.get_store()
+    try:
+        store.set(f"session:{session.id}", state, ttl=ttl)
+    except Exception as e:
+        # The DB row is already committed; readers fall back to it
+        print(f"Could not cache session {session.id}: {e}")
+        try:
+            store.delete(f"session:{session.id}")
+        except Exception:
+            pass
+    return state
+
+def load_session_state(session_id, db):
+    try:
+        state = shared_state.get_store().get(f"session:{session_id}")
+    except Exception as e:
+        print(f"Shared state unavailable, reading session {session_id} from the database: {e}")
+        state = None
+    if state is not None:
+        return state
+    session = db.query(models.TestSession).filter(models.TestSession.id == session_id).first()
+    if not session:
+        return None
+    return cache_session(session)
 
 @app.post("/api/start-test")
 def start_test(request: StartTestRequest, db: Session = Depends(get_db)):
@@ -105,36 +189,116 @@ def start_test(request: StartTestRequest, db: Session = Depends(get_db)):
     )
     db.add(session)
     db.commit()
+    cache_session(session)
     
     return {"session_id": session_id}
 
 @app.get("/api/test-status/{session_id}")
 def get_test_status(session_id: str, db: Session = Depends(get_db)):
-    session = db.query(models.TestSession).filter(models.TestSession.id == session_id).first()
+    session = load_session_state(session_id, db)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
         
     current_time = time.time()
-    remaining_exam = max(0, session.end_time - current_time)
+    remaining_exam = max(0, session["end_time"] - current_time)
     
     # Question timer logic (60s limit)
     # If 60s passed, should frontend auto-trigger next? 
     # Or strict server check? 
     # For now, just calculation.
     
-    q_elapsed = current_time - session.question_start_time
+    q_elapsed = current_time - session["question_start_time"]
     remaining_question = max(0, 60 - q_elapsed)
     
     return {
-        "session_id": session.id,
+        "session_id": session["id"],
         "remaining_exam_seconds": remaining_exam,
-        "current_question_index": session.current_question_id,
+        "current_question_index": session["current_question_id"],
         "remaining_question_seconds": remaining_question,
         "is_active": remaining_exam > 0
     }
 
+# Navigation/answer events are batched by the client and applied in one transaction.
+MAX_EVENTS_PER_BATCH = 500
+# Tolerated drift when mapping client timestamps onto the session's server-side window
+CLOCK_GRACE_SECONDS = 30
+
+class SessionEvent(BaseModel):
+    type: str # "navigate" or "answer"
+    client_ts: float # client clock, seconds since epoch
+    index: Optional[int] = None # navigate: new question index
+    question_id: Optional[int] = None # answer: Question.id
+    answer: Optional[str] = None # answer: option letter or subjective text
+
+class SessionEventsRequest(BaseModel):
+    session_id: str
+    sent_at: float # client clock when the batch was sent, used to correct clock skew
+    events: List[SessionEvent]
+
+def apply_session_events(db, session, events, now, clock_offset=0.0):
+    """
+    Validates events (in order) against the session's time window and applies
+    the valid ones to `session`. Returns (applied count, rejected list); the caller commits.
+    """
+    applied = 0
+    rejected = []
+    last_ts = None
+    latest_answers = {}
+    window_start = session.start_time - CLOCK_GRACE_SECONDS
+    window_end = min(now, session.end_time) + CLOCK_GRACE_SECONDS
+
+    for i, event in enumerate(events):
+        ts = event.client_ts + clock_offset
+        reason = None
+        if not window_start <= ts <= window_end:
+            reason = "outside session time window"
+        elif last_ts is not None and ts < last_ts:
+            reason = "out of order"
+        elif event.type == "navigate":
+            if event.index is None or event.index < 0:
+                reason = "invalid index"
+        elif event.type == "answer":
+            if event.question_id is None or not event.answer or len(event.answer) > 2000:
+                reason = "invalid answer"
+        else:
+            reason = "unknown event type"
+
+        if reason:
+            rejected.append({"event": i, "reason": reason})
+            continue
+
+        last_ts = ts
+        ts = max(session.start_time, min(ts, now))
+        if event.type == "navigate":
+            session.current_question_id = event.index
+            session.question_start_time = ts # Question timer starts when the student got there
+        else:
+            latest_answers[event.question_id] = (event.answer, ts)
+        applied += 1
+
+    for question_id, (answer, ts) in latest_answers.items():
+        db.merge(models.SessionAnswer(session_id=session.id, question_id=question_id, answer=answer, answered_at=ts))
+    return applied, rejected
+
+@app.post("/api/session-events")
+def ingest_session_events(request: SessionEventsRequest, db: Session = Depends(get_db)):
+    if len(request.events) > MAX_EVENTS_PER_BATCH:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_EVENTS_PER_BATCH} events per batch")
+    session = db.query(models.TestSession).filter(models.TestSession.id == request.session_id).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    now = time.time()
+    applied, rejected = apply_session_events(db, session, request.events, now, clock_offset=now - request.sent_at)
+    if applied:
+        db.commit()
+        cache_session(session)
+    return {"applied": applied, "rejected": rejected}
+
 @app.post("/api/update-question-index")
 def update_question_index(session_id: str, new_index: int, db: Session = Depends(get_db)):
+    # Kept for older clients with its original semantics: no time-window or index
+    # checks (those apply to /api/session-events only)
     session = db.query(models.TestSession).filter(models.TestSession.id == session_id).first()
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -142,6 +306,7 @@ def update_question_index(session_id: str, new_index: int, db: Session = Depends
     session.current_question_id = new_index
     session.question_start_time = time.time() # Reset question timer
     db.commit()
+    cache_session(session)
     return {"message": "Updated"}
 
 class QuestionResponse(BaseModel):
@@ -154,12 +319,16 @@ class QuestionResponse(BaseModel):
     option_d: str
     correct_option: str
     image_path: Optional[str] = None
+    # {"image/avif": "<url> 320w, <url> 640w", "image/webp": ...}; image_path stays the fallback src
+    image_srcset: Optional[Dict[str, str]] = None
     section: Optional[str] = "A" 
     subsection: Optional[str] = None 
     
     class Config:
         orm_mode = True
 
+paper_flight = SingleFlight()
+
 @app.get("/api/questions", response_model=List[QuestionResponse])
 def get_questions(
     subject: str = "Full NEET", 
@@ -167,6 +336,10 @@ def get_questions(
     duration: int = 10800, 
     db: Session = Depends(get_db)
 ):
+    # Identical requests that arrive while a paper is being built share that paper
+    return paper_flight.do((subject, duration), lambda: build_paper(subject, db))
+
+def build_paper(subject, db):
     questions = []
     
     if subject == "Full NEET":
@@ -176,7 +349,7 @@ def get_questions(
         # Biology: 100 (Botany 35A+15B, Zoology 35A+15B)
         
         def fetch_and_tag(subj, count_a, count_b, sub=None):
-            pool = db.query(models.Question).filter(models.Question.subject == subj).order_by(func.random()).limit(count_a + count_b).all()
+            pool = question_cache.sample_questions(db, subj, count_a + count_b)
             tagged = []
             for i, q in enumerate(pool):
                 q.section = "A" if i < count_a else "B"
@@ -187,7 +360,7 @@ def get_questions(
         questions.extend(fetch_and_tag("Physics", 35, 15))
         questions.extend(fetch_and_tag("Chemistry", 35, 15))
         
-        bio_pool = db.query(models.Question).filter(models.Question.subject == "Biology").order_by(func.random()).limit(100).all()
+        bio_pool = question_cache.sample_questions(db, "Biology", 100)
         botany = bio_pool[:50]
         zoology = bio_pool[50:]
         
@@ -205,18 +378,22 @@ def get_questions(
     else:
         # INDIVIDUAL SUBJECT: 40 Qs, No Sections
         # Wait, user said "Individual: 40 Qs, simple".
-        pool = db.query(models.Question).filter(models.Question.subject == subject).order_by(func.random()).limit(40).all()
+        pool = question_cache.sample_questions(db, subject, 40)
         for q in pool:
             q.section = "A"
             q.subsection = subject
         questions.extend(pool)
+
+    for q in questions:
+        q.image_srcset = image_pipeline.srcset_for(q.image_path)
     
-    return questions
+    # Plain response models, not ORM rows: single-flight followers share this list,
+    # and rows would stay bound to the leader's session after it closes
+    return [QuestionResponse.model_validate(q, from_attributes=True) for q in questions]
 
 @app.get("/api/subjects")
 def get_subjects(db: Session = Depends(get_db)):
-    subjects = db.query(models.Question.subject).distinct().all()
-    return [s[0] for s in subjects]
+    return question_cache.get_subjects(db)
 
 class ClearQuestionsRequest(BaseModel):
     confirm: bool
@@ -225,10 +402,12 @@ class ClearQuestionsRequest(BaseModel):
 def clear_questions(request: ClearQuestionsRequest, db: Session = Depends(get_db)):
     if not request.confirm:
         raise HTTPException(status_code=400, detail="Confirmation required to clear questions")
+    require_database_bank()
     
     try:
         db.query(models.Question).delete()
         db.commit()
+        question_cache.invalidate()
         print("All questions removed from database.")
         return {"status": "success", "message": "All questions cleared from database"}
     except Exception as e:
@@ -239,6 +418,7 @@ def clear_questions(request: ClearQuestionsRequest, db: Session = Depends(get_db
 def reload_questions(request: ClearQuestionsRequest, db: Session = Depends(get_db)):
     if not request.confirm:
         raise HTTPException(status_code=400, detail="Confirmation required to reload questions")
+    require_database_bank()
         
     try:
         # 1. Clear
@@ -249,7 +429,9 @@ def reload_questions(request: ClearQuestionsRequest, db: Session = Depends(get_d
         # 2. Reload
         # load_questions_from_text creates its own session, so we don't need to pass db
         print("Reloading questions from .txt files...")
+        from question_loader import load_questions_from_text
         stats = load_questions_from_text()
+        question_cache.invalidate()
         
         return {
             "status": "success", 
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float
+from sqlalchemy import Column, Integer, String, Float, ForeignKey
 from database import Base
 
 class TestSession(Base):
@@ -26,3 +26,11 @@ class Question(Base):
     image_path = Column(String, nullable=True)
     year = Column(Integer)
     source_id = Column(String, unique=True, index=True, nullable=True)
+
+class SessionAnswer(Base):
+    __tablename__ = "session_answers"
+
+    session_id = Column(String, ForeignKey("test_sessions.id"), primary_key=True)
+    question_id = Column(Integer, primary_key=True) # Question.id as served in the paper
+    answer = Column(String) # Option letter, or free text for subjective questions
+    answered_at = Column(Float) # UTC timestamp (server clock)
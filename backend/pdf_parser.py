@@ -1,9 +1,8 @@
-import pdfplumber
-import fitz  # PyMuPDF
 import re
 import os
 from models import Question
 from database import SessionLocal
+import question_cache
 import shutil
 
 UPLOAD_FOLDER = "../previousyear"
@@ -60,6 +59,8 @@ def parse_pdf(file_path):
     questions_buffer = [] # Store fully parsed questions before adding to DB
     
     # Text Extraction
+    # pdfplumber is heavy; import it only when a PDF is actually parsed
+    import pdfplumber
     full_lines = []
     with pdfplumber.open(file_path) as pdf:
         for page in pdf.pages:
@@ -165,6 +166,7 @@ def parse_pdf(file_path):
         
     db.commit()
     db.close()
+    question_cache.invalidate()
     print(f"Added {question_count} questions from {filename}")
 
 def parse_all_pdfs():
@@ -0,0 +1,160 @@
+import random
+import threading
+import time
+from types import SimpleNamespace
+from models import Question
+import shared_state
+
+# Per-subject list of question IDs. Papers are sampled from these lists
+# instead of running ORDER BY random() over the whole table on every request.
+_subject_ids = {}
+_lock = threading.Lock()
+# Set when _subject_ids holds a full load, even an empty one (empty bank)
+_loaded_at = None
+# Backstop for writes that bypass invalidate() (e.g. manual SQL): lists are reloaded this often
+CACHE_TTL_SECONDS = 300
+
+# Shared between workers: the ID lists (so only one worker scans the table) and a
+# version counter bumped on invalidate(), which makes every worker drop its copy.
+VERSION_KEY = "question_bank:version"
+IDS_KEY = "question_bank:subject_ids"
+_local_version = None
+
+# When set, questions are served from a memory-mapped snapshot instead of the database
+_snapshot = None
+
+def use_snapshot(path):
+    global _snapshot
+    from question_snapshot import QuestionSnapshot
+    _snapshot = QuestionSnapshot(path)
+    print(f"Serving {len(_snapshot)} questions from snapshot {path}")
+
+def serving_snapshot():
+    return _snapshot is not None
+
+def _clear_local():
+    global _loaded_at
+    _subject_ids.clear()
+    _loaded_at = None
+
+_last_store_error = 0.0
+
+def _store_failed(e):
+    # Without the store, each worker keeps its own lists; log at most once a minute
+    global _last_store_error
+    if time.time() - _last_store_error > 60:
+        _last_store_error = time.time()
+        print(f"Shared state unavailable, using this worker's question cache: {e}")
+
+def _sync_version():
+    global _local_version
+    try:
+        version = shared_state.get_store().get(VERSION_KEY) or 0
+    except Exception as e:
+        _store_failed(e)
+        version = _local_version
+    with _lock:
+        if version != _local_version:
+            _clear_local()
+            _local_version = version
+        elif _loaded_at is not None and time.time() - _loaded_at > CACHE_TTL_SECONDS:
+            _clear_local()
+    return version
+
+def load_subject_ids(db):
+    """
+    Rebuilds the cache from the shared store, or from (id, subject) for every
+    question if no worker has published the current version yet (or the store is down).
+    """
+    store = shared_state.get_store()
+    version = _sync_version()
+    try:
+        shared = store.get(IDS_KEY)
+    except Exception as e:
+        _store_failed(e)
+        shared = None
+    if shared is not None and shared["version"] == version:
+        ids = shared["ids"]
+    else:
+        ids = {}
+        for q_id, subject in db.query(Question.id, Question.subject).all():
+            ids.setdefault(subject, []).append(q_id)
+        try:
+            store.set(IDS_KEY, {"version": version, "ids": ids}, ttl=CACHE_TTL_SECONDS)
+        except Exception as e:
+            _store_failed(e)
+
+    global _loaded_at
+    with _lock:
+        _subject_ids.clear()
+        _subject_ids.update(ids)
+        _loaded_at = time.time()
+    return ids
+
+def get_subject_ids(db, subject):
+    _sync_version()
+    with _lock:
+        cached = _subject_ids.get(subject)
+        loaded = _loaded_at is not None
+    if cached is not None:
+        return cached
+    if loaded:
+        # Cache is warm, so the subject simply has no questions
+        return []
+    return load_subject_ids(db).get(subject, [])
+
+def get_subjects(db):
+    if _snapshot is not None:
+        return list(_snapshot.subjects.keys())
+    _sync_version()
+    with _lock:
+        if _loaded_at is not None:
+            return list(_subject_ids.keys())
+    return list(load_subject_ids(db).keys())
+
+def sample_questions(db, subject, count):
+    """
+    Returns up to `count` random questions of a subject, in random order.
+    """
+    if _snapshot is not None:
+        # Attribute access like ORM rows, so endpoints can tag them the same way
+        return [SimpleNamespace(**q) for q in _snapshot.sample(subject, count)]
+
+    ids = get_subject_ids(db, subject)
+    picked = random.sample(ids, min(count, len(ids)))
+    if not picked:
+        return []
+    rows = db.query(Question).filter(Question.id.in_(picked)).all()
+    by_id = {q.id: q for q in rows}
+    return [by_id[q_id] for q_id in picked if q_id in by_id]
+
+def invalidate():
+    """
+    Call after anything writes to the questions table, including offline tools
+    (text loader, PDF parser, snapshot import). Running servers cache question IDs,
+    so this bumps the shared version and every worker, in any process, drops its lists.
+    """
+    with _lock:
+        _clear_local()
+    try:
+        store = shared_state.get_store()
+        store.delete(IDS_KEY)
+        store.incr(VERSION_KEY)
+    except Exception as e:
+        # Workers still pick up the change within CACHE_TTL_SECONDS
+        print(f"Could not notify workers of question bank change: {e}")
+
+def warm_up(session_factory):
+    """
+    Fills the cache using a fresh session. Meant to run off the request path.
+    """
+    if _snapshot is not None:
+        return
+    db = session_factory()
+    try:
+        ids = load_subject_ids(db)
+        print(f"Question cache warmed: {sum(len(v) for v in ids.values())} questions")
+    except Exception as e:
+        print(f"Question cache warm-up failed: {e}")
+    finally:
+        db.close()
@@ -0,0 +1,258 @@
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import re
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from question_loader import (
+    PREVIOUS_YEAR_FOLDER, SUBJECT_PATTERN, QUESTION_PATTERN, OPTION_PATTERNS,
+    ANSWER_PATTERN, clean_text, parse_block, split_blocks
+)
+
+# Bump when checks change so cached results are not reused
+LINT_VERSION = b"2"
+CACHE_PATH = ".lint_cache.pickle"
+CHUNK_SIZE = 2000
+
+KNOWN_SUBJECTS = {"Physics", "Chemistry", "Biology", "Botany", "Zoology"}
+VALID_ANSWERS = {"A", "B", "C", "D"}
+
+# Codes that make the loader skip (or wrongly load) a block; everything else is a warning
+ERROR_CODES = {"missing_id", "missing_question", "missing_option", "missing_answer", "bad_answer",
+               "unparseable", "duplicate_id"}
+
+# The answer field itself; "answer:" inside question text (e.g. "Choose the correct answer:") doesn't count
+ANSWER_LINE_PATTERN = re.compile(r"^[ \t]*Answer:[ \t]*(\S*)", re.IGNORECASE | re.MULTILINE)
+
+def check_block(block_text):
+    """
+    Checks one block's text (everything after its "[ID: ...]").
+    Returns a tuple of (code, message) pairs; empty when the block is clean.
+    """
+    issues = []
+
+    subject_match = SUBJECT_PATTERN.search(block_text)
+    if not subject_match:
+        issues.append(("missing_subject", "No 'Subject:' field; the loader files it under 'General'"))
+    else:
+        subject = clean_text(subject_match.group(1))
+        if subject not in KNOWN_SUBJECTS:
+            if subject.title() in KNOWN_SUBJECTS:
+                issues.append(("suspicious_subject", f"Subject '{subject}' should be '{subject.title()}'"))
+            else:
+                issues.append(("suspicious_subject", f"Unknown subject '{subject}'"))
+
+    if not QUESTION_PATTERN.search(block_text):
+        issues.append(("missing_question", "No 'Question:' field followed by option A"))
+
+    for letter, pattern in OPTION_PATTERNS.items():
+        option_match = pattern.search(block_text)
+        if not option_match:
+            # A-C are only recognised when the next option follows them
+            followed_by = f", or not followed by option {chr(ord(letter) + 1)}" if letter != "D" else ""
+            issues.append(("missing_option", f"Option {letter} not found{followed_by}"))
+        elif not clean_text(option_match.group(1)):
+            issues.append(("empty_option", f"Option {letter} is empty"))
+
+    answer_line = ANSWER_LINE_PATTERN.search(block_text)
+    if not answer_line:
+        issues.append(("missing_answer", "No 'Answer:' field"))
+    else:
+        answer = answer_line.group(1).upper()
+        if answer not in VALID_ANSWERS:
+            # The loader only looks at the first letter, so "Both" would load as B
+            issues.append(("bad_answer", f"Answer '{answer_line.group(1)}' is not one of A-D"))
+        else:
+            # The loader takes the first "answer:" anywhere in the block, which can be in the question text
+            loaded = ANSWER_PATTERN.search(block_text).group(1).upper()
+            if loaded != answer:
+                issues.append(("bad_answer", f"Answer is '{answer}' but the loader would read '{loaded}' "
+                                             "from an earlier 'answer:' in the text"))
+
+    if parse_block(block_text, 0) is None and not any(code in ERROR_CODES for code, _ in issues):
+        # Safety net: the loader rejects it for a reason the checks above don't name
+        issues.append(("unparseable", "Block is rejected by the loader"))
+    return tuple(issues)
+
+def _check_chunk(chunk):
+    return [(digest, check_block(text)) for digest, text in chunk]
+
+def block_digest(block_text):
+    return hashlib.sha1(LINT_VERSION + block_text.encode("utf-8")).digest()
+
+def load_cache(path):
+    """
+    Cache layout: {"version", "files": {name: (file digest, [(line, id, block digest)])},
+    "results": {block digest: issues}}.
+    """
+    empty = {"version": LINT_VERSION, "files": {}, "results": {}}
+    if not path or not os.path.exists(path):
+        return empty
+    try:
+        with open(path, "rb") as f:
+            cache = pickle.load(f)
+    except Exception as e:
+        print(f"Ignoring unreadable lint cache {path}: {e}", file=sys.stderr)
+        return empty
+    return cache if cache.get("version") == LINT_VERSION else empty
+
+def save_cache(path, cache):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+def tokenize_source(content):
+    """
+    Splits one source into blocks.
+    Returns [(line, id, digest)] and {digest: block_text}.
+    """
+    blocks = []
+    texts = {}
+    line, last_offset = 1, 0
+    for id_str, block_text, offset in split_blocks(content):
+        line += content.count("\n", last_offset, offset)
+        last_offset = offset
+        digest = block_digest(block_text)
+        texts[digest] = block_text
+        blocks.append((line, id_str, digest))
+    return blocks, texts
+
+def lint_folder(folder=PREVIOUS_YEAR_FOLDER, cache_path=CACHE_PATH, jobs=None):
+    start = time.perf_counter()
+    cache = load_cache(cache_path)
+    results = cache["results"]
+
+    # Files whose bytes are unchanged reuse their cached block list; the rest are re-split
+    files = {}
+    pending_texts = {}
+    changed = False
+    for filename in sorted(os.listdir(folder)):
+        if not filename.endswith(".txt"):
+            continue
+        with open(os.path.join(folder, filename), "rb") as f:
+            raw = f.read()
+        file_digest = hashlib.sha1(raw).digest()
+        cached_file = cache["files"].get(filename)
+        if cached_file and cached_file[0] == file_digest:
+            files[filename] = cached_file
+            continue
+        changed = True
+        blocks, texts = tokenize_source(raw.decode("utf-8"))
+        files[filename] = (file_digest, blocks)
+        pending_texts.update((d, t) for d, t in texts.items() if d not in results)
+    changed = changed or files.keys() != cache["files"].keys()
+
+    # Only blocks whose text changed since the last run are parsed again
+    misses = list(pending_texts.items())
+    if len(misses) <= CHUNK_SIZE:
+        results.update(_check_chunk(misses))
+    else:
+        chunks = [misses[i:i + CHUNK_SIZE] for i in range(0, len(misses), CHUNK_SIZE)]
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            for chunk_result in pool.map(_check_chunk, chunks):
+                results.update(chunk_result)
+
+    if cache_path and changed:
+        # Drop results for blocks that no longer exist so the cache doesn't grow forever
+        live = {digest for _, blocks in files.values() for _, _, digest in blocks}
+        results = {digest: issues for digest, issues in results.items() if digest in live}
+        save_cache(cache_path, {"version": LINT_VERSION, "files": files, "results": results})
+
+    issues = []
+    first_by_id = {}
+    first_by_content = {}
+    total_blocks = 0
+    # Per block occurrence: a block repeated in another file counts as parsed if its text was checked this run
+    checked = pending_texts.keys()
+    parsed_blocks = 0
+    for filename, (_, blocks) in files.items():
+        for line, id_str, digest in blocks:
+            total_blocks += 1
+            parsed_blocks += digest in checked
+            location = (filename, line, id_str)
+            block_issues = results[digest]
+            if not id_str:
+                block_issues += (("missing_id", "Empty [ID: ] marker"),)
+
+            # Cross-block checks, cheap enough to redo every run
+            first = first_by_id.setdefault(id_str, location)
+            if id_str and first is not location:
+                block_issues += (("duplicate_id", f"ID already used at {first[0]}:{first[1]}"),)
+            first = first_by_content.setdefault(digest, location)
+            if first is not location and first[2] != id_str:
+                block_issues += (("duplicate_content", f"Same question as ID {first[2]} ({first[0]}:{first[1]})"),)
+
+            for code, message in block_issues:
+                issues.append({
+                    "file": filename, "line": line, "id": id_str, "code": code,
+                    "severity": "error" if code in ERROR_CODES else "warning", "message": message,
+                })
+
+    severities = Counter(i["severity"] for i in issues)
+    return {
+        "summary": {
+            "files": len(files),
+            "blocks": total_blocks,
+            "parsed": parsed_blocks,
+            "cached": total_blocks - parsed_blocks,
+            "errors": severities["error"],
+            "warnings": severities["warning"],
+            "by_code": dict(Counter(i["code"] for i in issues)),
+            "seconds": round(time.perf_counter() - start, 3),
+        },
+        "issues": issues,
+    }
+
+def lint_database():
+    """
+    Flags questions in the database that did not come from a text source. PDF imports
+    store a placeholder answer ('A') and a subject guessed from the question number.
+    """
+    from database import SessionLocal
+    from models import Question
+
+    db = SessionLocal()
+    try:
+        rows = db.query(Question.id, Question.year, Question.subject).filter(Question.source_id.is_(None)).all()
+    finally:
+        db.close()
+    return [
+        {"file": "neet.db", "line": 0, "id": str(q_id), "code": "unverified_pdf_import", "severity": "warning",
+         "message": f"{subject} question from {year} PDF has a placeholder answer and a guessed subject"}
+        for q_id, year, subject in rows
+    ]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate question bank sources without loading them")
+    parser.add_argument("--folder", default=PREVIOUS_YEAR_FOLDER)
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout")
+    parser.add_argument("--no-cache", action="store_true", help="Re-check every block")
+    parser.add_argument("--jobs", type=int, default=None, help="Parallel worker processes")
+    parser.add_argument("--db", action="store_true", help="Also flag PDF-imported rows in neet.db")
+    args = parser.parse_args()
+
+    report = lint_folder(args.folder, None if args.no_cache else CACHE_PATH, args.jobs)
+    if args.db:
+        db_issues = lint_database()
+        report["issues"].extend(db_issues)
+        report["summary"]["warnings"] += len(db_issues)
+        if db_issues:
+            report["summary"]["by_code"]["unverified_pdf_import"] = len(db_issues)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+    else:
+        json.dump(report, sys.stdout, indent=1)
+        print()
+
+    s = report["summary"]
+    print(f"{s['blocks']} blocks in {s['files']} files ({s['parsed']} parsed, {s['cached']} cached): "
+          f"{s['errors']} errors, {s['warnings']} warnings in {s['seconds']}s", file=sys.stderr)
+    sys.exit(1 if s["errors"] else 0)
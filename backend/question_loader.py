@@ -2,9 +2,22 @@ import os
 import re
 from models import Question
 from database import SessionLocal
+import question_cache
 
 PREVIOUS_YEAR_FOLDER = "previousyear"
 
+# Field patterns for a question block (shared with question_lint.py)
+SUBJECT_PATTERN = re.compile(r"Subject:\s*(.*?)(?=\s+Question:|\nQuestion:)", re.DOTALL | re.IGNORECASE)
+QUESTION_PATTERN = re.compile(r"Question:\s*(.*?)(?=\s+A\.|\nA\.)", re.DOTALL | re.IGNORECASE)
+OPTION_PATTERNS = {
+    "A": re.compile(r"A\.\s*(.*?)(?=\s+B\.|\nB\.)", re.DOTALL),
+    "B": re.compile(r"B\.\s*(.*?)(?=\s+C\.|\nC\.)", re.DOTALL),
+    "C": re.compile(r"C\.\s*(.*?)(?=\s+D\.|\nD\.)", re.DOTALL),
+    # D ends at "Answer:" or end of string.
+    "D": re.compile(r"D\.\s*(.*?)(?=\s*Answer:|\s*$)", re.DOTALL | re.IGNORECASE),
+}
+ANSWER_PATTERN = re.compile(r"Answer:\s*([A-D])", re.IGNORECASE)
+
 def clean_text(text):
     if not text:
         return ""
@@ -42,7 +55,7 @@ def parse_block(block_text, year):
     # Updated regex to handle both multiline and single-line (space separated) formats
     
     # Subject: from "Subject:" to "Question:"
-    subject_match = re.search(r"Subject:\s*(.*?)(?=\s+Question:|\nQuestion:)", block_text, re.DOTALL | re.IGNORECASE)
+    subject_match = SUBJECT_PATTERN.search(block_text)
     # If standard block, subject might not be explicitly tagged if we rely on file context, 
     # but our format requires it or we default. 
     # Actually, the user input has "Subject: ..." so this should work.
@@ -51,20 +64,20 @@ def parse_block(block_text, year):
     subject = clean_text(subject_match.group(1)) if subject_match else "General"
     
     # Question: from "Question:" to "A."
-    q_match = re.search(r"Question:\s*(.*?)(?=\s+A\.|\nA\.)", block_text, re.DOTALL | re.IGNORECASE)
+    q_match = QUESTION_PATTERN.search(block_text)
     if not q_match:
         return None
     question_text = clean_text(q_match.group(1))
     
     # Options
     # Use lookahead for " LETTER." preceded by whitespace/newline
-    a_match = re.search(r"A\.\s*(.*?)(?=\s+B\.|\nB\.)", block_text, re.DOTALL)
-    b_match = re.search(r"B\.\s*(.*?)(?=\s+C\.|\nC\.)", block_text, re.DOTALL)
-    c_match = re.search(r"C\.\s*(.*?)(?=\s+D\.|\nD\.)", block_text, re.DOTALL)
+    a_match = OPTION_PATTERNS["A"].search(block_text)
+    b_match = OPTION_PATTERNS["B"].search(block_text)
+    c_match = OPTION_PATTERNS["C"].search(block_text)
     
     # D ends at "Answer:" or end of string. 
     # matched group(1) will be stripped by clean_text later.
-    d_match = re.search(r"D\.\s*(.*?)(?=\s*Answer:|\s*$)", block_text, re.DOTALL | re.IGNORECASE)
+    d_match = OPTION_PATTERNS["D"].search(block_text)
     
     if not (a_match and b_match and c_match and d_match):
         return None
@@ -75,7 +88,7 @@ def parse_block(block_text, year):
     opt_d = clean_text(d_match.group(1))
     
     # Answer
-    ans_match = re.search(r"Answer:\s*([A-D])", block_text, re.IGNORECASE)
+    ans_match = ANSWER_PATTERN.search(block_text)
     if not ans_match:
         return None
     answer = ans_match.group(1).upper()
@@ -91,6 +104,22 @@ def parse_block(block_text, year):
         "year": year
     }
 
+def split_blocks(content):
+    """
+    Splits a source file on "[ID:" markers.
+    Yields (id_str, block_text, offset), where offset is where the block starts in `content`.
+    """
+    offset = 0
+    for block in re.split(r"\[ID:", content):
+        start = offset
+        offset += len(block) + len("[ID:")
+        if not block.strip():
+            continue
+        if "]" not in block:
+            continue
+        closing_bracket_index = block.find("]")
+        yield block[:closing_bracket_index].strip(), block[closing_bracket_index+1:], start
+
 def load_questions_from_text():
     if not os.path.exists(PREVIOUS_YEAR_FOLDER):
         print(f"Folder {PREVIOUS_YEAR_FOLDER} not found.")
@@ -129,21 +158,10 @@ def load_questions_from_text():
         with open(file_path, "r", encoding="utf-8") as f:
             content = f.read()
             
-        # Split by [ID:
-        raw_blocks = re.split(r"\[ID:", content)
-        
         file_added = 0
         
-        for block in raw_blocks:
-            if not block.strip():
-                continue
-            
-            if "]" not in block:
-                continue
-                
-            closing_bracket_index = block.find("]")
-            id_str = block[:closing_bracket_index].strip() 
-            
+        # Split by [ID:
+        for id_str, real_content, _ in split_blocks(content):
             # Construct strict source_id unique key
             # user provided example: 2022-100
             # If id_str is "2022-100", use that.
@@ -163,8 +181,6 @@ def load_questions_from_text():
                 
             seen_ids.add(source_id)
             
-            real_content = block[closing_bracket_index+1:]
-            
             parsed_q = parse_block(real_content, year)
             
             if parsed_q:
@@ -181,6 +197,7 @@ def load_questions_from_text():
         
     db.commit()
     db.close()
+    question_cache.invalidate()
     print(f"Done. Added: {total_added}. Skipped: {total_skipped}. Duplicates: {total_duplicates}")
     return {
         "total_added": total_added,
@@ -0,0 +1,312 @@
+"""
+Compact, versioned binary snapshot of the question bank.
+
+Layout (little-endian):
+    header    magic, version, counts, section offsets, body CRC32, header CRC32
+    subjects  one fixed-width entry per distinct subject:
+              name offset into the string buffer, first record, record count
+    records   one 14-byte entry per question, sorted by subject:
+              id, year, subject index, correct option, NULL-field bitmask,
+              and the offset of the record's text in the string buffer
+    strings   UTF-8 text; each value is a varint length followed by its bytes.
+              A record's text fields sit back to back in TEXT_FIELDS order,
+              with NULL fields left out.
+
+Subjects are interned once, so a record only carries a 2-byte subject index,
+and a subject's questions are one contiguous range of records. Readers
+memory-map the file and decode only the records they touch.
+"""
+import mmap
+import os
+import random
+import struct
+import zlib
+
+MAGIC = b"NEETQB\x00\x00"
+VERSION = 2
+
+# magic, version, flags, record_count, subject_count,
+# subjects_offset, records_offset, strings_offset, strings_size, body_crc
+HEADER = struct.Struct("<8sHHIIQQQQI")
+HEADER_CRC = struct.Struct("<I")
+HEADER_SIZE = HEADER.size + HEADER_CRC.size
+
+# name offset, first record, record count
+SUBJECT = struct.Struct("<III")
+
+TEXT_FIELDS = ("question_text", "option_a", "option_b", "option_c", "option_d", "image_path", "source_id")
+# id, year, subject index, correct option (ASCII), NULL bitmask (bit i = TEXT_FIELDS[i]), text offset
+RECORD = struct.Struct("<IHHBBI")
+
+ANSWERS = {"A", "B", "C", "D"}
+MAX_STRINGS_SIZE = 0xFFFFFFFF
+
+class SnapshotError(Exception):
+    pass
+
+def _encode_varint(n, out):
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+def write_snapshot(path, questions):
+    """
+    Writes question dicts (Question column names as keys) to `path`.
+    Rows without an A-D answer are left out, since the snapshot cannot represent them.
+    Returns (records written, rows skipped).
+    """
+    valid = [q for q in questions if (q.get("correct_option") or "").strip().upper() in ANSWERS]
+    skipped = len(questions) - len(valid)
+    questions = sorted(valid, key=lambda q: (q["subject"] or "", q["id"]))
+
+    strings = bytearray()
+
+    def add_string(value):
+        data = value.encode("utf-8")
+        _encode_varint(len(data), strings)
+        strings.extend(data)
+
+    subjects = []  # [name, first_record, count]
+    records = bytearray()
+    for index, q in enumerate(questions):
+        subject = q["subject"] or ""
+        if not subjects or subjects[-1][0] != subject:
+            subjects.append([subject, index, 0])
+        subjects[-1][2] += 1
+
+        offset = len(strings)
+        null_mask = 0
+        for bit, field in enumerate(TEXT_FIELDS):
+            value = q.get(field)
+            if value is None:
+                null_mask |= 1 << bit
+            else:
+                add_string(value)
+        if offset > MAX_STRINGS_SIZE:
+            raise SnapshotError(f"Question bank text exceeds 4 GiB; snapshot format v{VERSION} cannot hold it")
+        records.extend(RECORD.pack(
+            q["id"],
+            q.get("year") or 0,
+            len(subjects) - 1,
+            ord(q["correct_option"].strip().upper()),
+            null_mask,
+            offset
+        ))
+
+    subject_table = bytearray()
+    for name, first, count in subjects:
+        offset = len(strings)
+        add_string(name)
+        subject_table.extend(SUBJECT.pack(offset, first, count))
+
+    if len(strings) > MAX_STRINGS_SIZE:
+        raise SnapshotError(f"Question bank text exceeds 4 GiB; snapshot format v{VERSION} cannot hold it")
+
+    subjects_offset = HEADER_SIZE
+    records_offset = subjects_offset + len(subject_table)
+    strings_offset = records_offset + len(records)
+
+    body_crc = zlib.crc32(subject_table)
+    body_crc = zlib.crc32(records, body_crc)
+    body_crc = zlib.crc32(strings, body_crc)
+
+    header = HEADER.pack(
+        MAGIC, VERSION, 0, len(questions), len(subjects),
+        subjects_offset, records_offset, strings_offset, len(strings), body_crc
+    )
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(HEADER_CRC.pack(zlib.crc32(header)))
+        f.write(subject_table)
+        f.write(records)
+        f.write(strings)
+    os.replace(tmp_path, path)
+    return len(questions), skipped
+
+class QuestionSnapshot:
+    """
+    Read-only, memory-mapped view of a snapshot file.
+    """
+    def __init__(self, path, verify=False):
+        self.path = path
+        with open(path, "rb") as f:
+            # mmap can't map an empty file, so check the size before mapping
+            if os.fstat(f.fileno()).st_size < HEADER_SIZE:
+                raise SnapshotError(f"{path} is too small to be a question snapshot")
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        header = self._mm[:HEADER.size]
+        (stored_crc,) = HEADER_CRC.unpack_from(self._mm, HEADER.size)
+        if zlib.crc32(header) != stored_crc:
+            raise SnapshotError(f"{path}: header checksum mismatch")
+
+        (magic, version, _flags, self.record_count, subject_count,
+         self._subjects_offset, self._records_offset, self._strings_offset,
+         strings_size, self._body_crc) = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise SnapshotError(f"{path} is not a question snapshot")
+        if version != VERSION:
+            raise SnapshotError(f"{path}: unsupported snapshot version {version}")
+        if len(self._mm) != self._strings_offset + strings_size:
+            raise SnapshotError(f"{path}: file is truncated")
+        if verify:
+            self.verify()
+
+        # Subject table is tiny; decode it eagerly
+        self.subjects = {}
+        try:
+            for i in range(subject_count):
+                offset, first, count = SUBJECT.unpack_from(
+                    self._mm, self._subjects_offset + i * SUBJECT.size
+                )
+                name, _ = self._string(self._strings_offset + offset)
+                self.subjects[name] = (first, count)
+        except (struct.error, IndexError, UnicodeDecodeError) as e:
+            raise SnapshotError(f"{path}: corrupt subject table ({e})")
+        self._subject_names = list(self.subjects.keys())
+
+    def verify(self):
+        """
+        Checks the body CRC32. Reads the whole file, so it is opt-in.
+        """
+        if zlib.crc32(self._mm[HEADER_SIZE:]) != self._body_crc:
+            raise SnapshotError(f"{self.path}: body checksum mismatch")
+
+    def _string(self, pos):
+        """
+        Decodes the varint-prefixed string at absolute position `pos`.
+        Returns (value, position after it).
+        """
+        mm = self._mm
+        length = shift = 0
+        while True:
+            byte = mm[pos]
+            pos += 1
+            length |= (byte & 0x7F) << shift
+            if byte < 0x80:
+                break
+            shift += 7
+        return mm[pos:pos + length].decode("utf-8"), pos + length
+
+    def __len__(self):
+        return self.record_count
+
+    def record(self, index):
+        """
+        Decodes one record into a dict shaped like a Question row.
+        """
+        if not 0 <= index < self.record_count:
+            raise IndexError(index)
+        q_id, year, subject_index, correct, null_mask, offset = RECORD.unpack_from(
+            self._mm, self._records_offset + index * RECORD.size
+        )
+        q = {
+            "id": q_id,
+            "subject": self._subject_names[subject_index],
+            "correct_option": chr(correct),
+            "year": year or None,
+        }
+        pos = self._strings_offset + offset
+        for bit, field in enumerate(TEXT_FIELDS):
+            if null_mask & (1 << bit):
+                q[field] = None
+            else:
+                q[field], pos = self._string(pos)
+        return q
+
+    def __iter__(self):
+        for i in range(self.record_count):
+            yield self.record(i)
+
+    def sample(self, subject, count):
+        """
+        Returns up to `count` random records of a subject, in random order.
+        """
+        first, total = self.subjects.get(subject, (0, 0))
+        picked = random.sample(range(first, first + total), min(count, total))
+        return [self.record(i) for i in picked]
+
+    def close(self):
+        self._mm.close()
+
+def export_snapshot(path):
+    from database import SessionLocal, init_db
+    from models import Question
+
+    init_db()
+    db = SessionLocal()
+    try:
+        columns = [c.name for c in Question.__table__.columns]
+        rows = db.query(*[getattr(Question, c) for c in columns]).all()
+        count, skipped = write_snapshot(path, [dict(zip(columns, row)) for row in rows])
+    finally:
+        db.close()
+    print(f"Exported {count} questions to {path} ({os.path.getsize(path)} bytes)")
+    if skipped:
+        print(f"Skipped {skipped} questions without an A-D answer")
+    return count
+
+def import_snapshot(path):
+    """
+    Inserts snapshot questions into the database, skipping source IDs that already exist.
+    """
+    from database import SessionLocal, init_db
+    from models import Question
+
+    snapshot = QuestionSnapshot(path, verify=True)
+    init_db()
+    db = SessionLocal()
+
+    total_added = 0
+    total_duplicates = 0
+    try:
+        seen_ids = {s for (s,) in db.query(Question.source_id).filter(Question.source_id.isnot(None))}
+        batch = []
+        for q in snapshot:
+            source_id = q["source_id"]
+            if source_id is not None:
+                if source_id in seen_ids:
+                    total_duplicates += 1
+                    continue
+                seen_ids.add(source_id)
+            # Row IDs are local to each database; let SQLite assign new ones
+            del q["id"]
+            batch.append(q)
+            if len(batch) >= 5000:
+                db.bulk_insert_mappings(Question, batch)
+                total_added += len(batch)
+                batch = []
+        if batch:
+            db.bulk_insert_mappings(Question, batch)
+            total_added += len(batch)
+        db.commit()
+    finally:
+        db.close()
+        snapshot.close()
+
+    import question_cache
+    question_cache.invalidate()
+
+    print(f"Done. Added: {total_added}. Duplicates: {total_duplicates}")
+    return {"total_added": total_added, "total_duplicates": total_duplicates}
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export/import the question bank as a binary snapshot")
+    parser.add_argument("command", choices=["export", "import", "info"])
+    parser.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "export":
+        export_snapshot(args.path)
+    elif args.command == "import":
+        import_snapshot(args.path)
+    else:
+        snap = QuestionSnapshot(args.path, verify=True)
+        print(f"{args.path}: version {VERSION}, {len(snap)} questions")
+        for name, (_, count) in snap.subjects.items():
+            print(f"{name}: {count}")
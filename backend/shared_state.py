@@ -0,0 +1,328 @@
+"""
+Key/value state shared by all workers of the app (session timers, question
+bank caches, counters).
+
+Backends are picked by URL:
+    local://                  in-process dict; one worker only, or tests
+    unix:///path/to/sock      default. The first worker to start serves the store
+                              over a Unix socket and the others connect to it. If
+                              that worker exits, the next client to notice takes over.
+                              The socket's directory must be owned by this user and
+                              closed to others; it is created that way if missing.
+    redis://host:6379/0       any Redis-compatible server (needs `pip install redis`)
+    redis+local://            the Redis backend on a local stand-in client, for tests
+
+Values must be JSON-serialisable. TTLs are in seconds.
+"""
+import fcntl
+import hashlib
+import json
+import os
+import socket
+import socketserver
+import struct
+import tempfile
+import threading
+import time
+
+def default_socket_path():
+    # A per-user directory, never a shared name in /tmp, and one store per backend
+    # directory so two checkouts (with different databases) never share question IDs
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        folder = os.path.join(runtime_dir, "neetmock")
+    else:
+        folder = os.path.join(tempfile.gettempdir(), f"neetmock-{os.getuid()}")
+    tag = hashlib.sha1(os.getcwd().encode()).hexdigest()[:10]
+    return os.path.join(folder, f"state-{tag}.sock")
+
+DEFAULT_URL = "unix://" + default_socket_path()
+
+class LocalStore:
+    """
+    Thread-safe in-process store. Also the data structure behind SocketStore's server.
+    """
+    SWEEP_EVERY = 1000
+
+    def __init__(self):
+        self._data = {}  # key -> (value, expires_at or None)
+        self._lock = threading.Lock()
+        self._writes = 0
+
+    def _live(self, key, now):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        if item[1] is not None and item[1] <= now:
+            del self._data[key]
+            return None
+        return item
+
+    def _sweep(self, now):
+        expired = [k for k, (_, exp) in self._data.items() if exp is not None and exp <= now]
+        for k in expired:
+            del self._data[k]
+
+    def get(self, key):
+        with self._lock:
+            item = self._live(key, time.time())
+            return item[0] if item else None
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        with self._lock:
+            self._data[key] = (value, now + ttl if ttl else None)
+            self._writes += 1
+            if self._writes % self.SWEEP_EVERY == 0:
+                self._sweep(now)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incr(self, key, amount=1, ttl=None):
+        now = time.time()
+        with self._lock:
+            item = self._live(key, now)
+            if item is None:
+                value, expires_at = amount, (now + ttl if ttl else None)
+            else:
+                value, expires_at = item[0] + amount, item[1]
+            self._data[key] = (value, expires_at)
+            return value
+
+class _StoreRequestHandler(socketserver.StreamRequestHandler):
+    # One JSON line per request: [op, *args]; one JSON line back: {"ok": result} or {"error": msg}
+    def handle(self):
+        store = self.server.store
+        for line in self.rfile:
+            try:
+                op, *args = json.loads(line)
+                if op not in ("get", "set", "delete", "incr"):
+                    raise ValueError(f"unknown op {op!r}")
+                reply = {"ok": getattr(store, op)(*args)}
+            except Exception as e:
+                reply = {"error": str(e)}
+            self.wfile.write(json.dumps(reply).encode() + b"\n")
+
+class _StoreServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path, store):
+        self.store = store
+        super().__init__(path, _StoreRequestHandler)
+
+class SocketStore:
+    """
+    Client for a LocalStore served over a Unix socket by one worker on this host.
+    """
+    CONNECT_ATTEMPTS = 50
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._server = None
+        self._lock_fd = None
+
+    def _ensure_private_dir(self):
+        # Anyone who can write to the directory could bind the socket first and
+        # then control every worker's state, so refuse shared directories
+        folder = os.path.dirname(self.path) or "."
+        if not os.path.isdir(folder):
+            os.makedirs(folder, mode=0o700, exist_ok=True)
+        info = os.stat(folder)
+        if info.st_uid != os.geteuid() or info.st_mode & 0o077:
+            raise ConnectionError(
+                f"Shared state directory {folder} must be owned by this user and closed to others (chmod 700)"
+            )
+
+    def _try_serve(self):
+        # Whoever holds the lock file owns the socket. The OS drops the lock when
+        # that process dies, so a stale socket is only unlinked by its new owner.
+        fd = os.open(self.path + ".lock", os.O_CREAT | os.O_RDWR, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        # The socket is created 0600 rather than chmod-ed after bind
+        old_umask = os.umask(0o177)
+        try:
+            self._server = _StoreServer(self.path, LocalStore())
+        finally:
+            os.umask(old_umask)
+        self._lock_fd = fd
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        print(f"Shared state served on {self.path} (pid {os.getpid()})")
+        return True
+
+    def _check_peer(self, sock):
+        # Linux reports who bound the socket; only talk to our own user's store
+        peercred = getattr(socket, "SO_PEERCRED", None)
+        if peercred is None:
+            return
+        _pid, uid, _gid = struct.unpack("3i", sock.getsockopt(socket.SOL_SOCKET, peercred, struct.calcsize("3i")))
+        if uid != os.geteuid():
+            sock.close()
+            raise ConnectionError(f"Shared state socket {self.path} belongs to another user (uid {uid})")
+
+    def _connect(self):
+        self._ensure_private_dir()
+        for _ in range(self.CONNECT_ATTEMPTS):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.path)
+            except (FileNotFoundError, ConnectionRefusedError):
+                sock.close()
+                if not self._try_serve():
+                    # Another worker owns the store and is still starting up
+                    time.sleep(0.02)
+                continue
+            self._check_peer(sock)
+            return sock, sock.makefile("rb")
+        raise ConnectionError(f"Shared state store at {self.path} is unavailable")
+
+    def _call(self, *request):
+        payload = json.dumps(request).encode() + b"\n"
+        for attempt in range(2):
+            conn = getattr(self._local, "conn", None)
+            if conn is None:
+                conn = self._local.conn = self._connect()
+            sock, reader = conn
+            try:
+                sock.sendall(payload)
+                line = reader.readline()
+                if not line:
+                    raise ConnectionError("store closed the connection")
+                break
+            except OSError:
+                # The serving worker went away; reconnect (and maybe take over) once
+                sock.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+        reply = json.loads(line)
+        if "error" in reply:
+            raise RuntimeError(f"Shared state error: {reply['error']}")
+        return reply["ok"]
+
+    def get(self, key):
+        return self._call("get", key)
+
+    def set(self, key, value, ttl=None):
+        self._call("set", key, value, ttl)
+
+    def delete(self, key):
+        self._call("delete", key)
+
+    def incr(self, key, amount=1, ttl=None):
+        return self._call("incr", key, amount, ttl)
+
+class _LocalRedis:
+    """
+    Minimal stand-in for the redis-py client methods RedisStore uses. Like Redis,
+    it stores values as bytes and keeps counters as decimal strings.
+    """
+    def __init__(self):
+        self._data = {}  # key -> (bytes, expires_at or None)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _to_bytes(value):
+        if isinstance(value, bytes):
+            return value
+        if isinstance(value, (str, int, float)):
+            return str(value).encode()
+        raise TypeError(f"Invalid value type {type(value).__name__}; convert to bytes, str or a number first")
+
+    def _live(self, key):
+        item = self._data.get(key)
+        if item is not None and item[1] is not None and item[1] <= time.time():
+            del self._data[key]
+            return None
+        return item
+
+    def get(self, key):
+        with self._lock:
+            item = self._live(key)
+            return item[0] if item else None
+
+    def set(self, key, value, ex=None):
+        with self._lock:
+            self._data[key] = (self._to_bytes(value), time.time() + ex if ex else None)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def incrby(self, key, amount):
+        with self._lock:
+            item = self._live(key)
+            try:
+                value = int(item[0] if item else 0) + amount
+            except ValueError:
+                raise ValueError("value is not an integer or out of range")
+            # INCRBY keeps the key's expiry
+            self._data[key] = (str(value).encode(), item[1] if item else None)
+            return value
+
+    def expire(self, key, seconds):
+        with self._lock:
+            item = self._live(key)
+            if item is not None:
+                self._data[key] = (item[0], time.time() + seconds)
+
+class RedisStore:
+    def __init__(self, client):
+        self.client = client
+
+    def get(self, key):
+        raw = self.client.get(key)
+        return None if raw is None else json.loads(raw)
+
+    def set(self, key, value, ttl=None):
+        self.client.set(key, json.dumps(value), ex=ttl)
+
+    def delete(self, key):
+        self.client.delete(key)
+
+    def incr(self, key, amount=1, ttl=None):
+        value = int(self.client.incrby(key, amount))
+        if ttl and value == amount:
+            # First increment created the key
+            self.client.expire(key, ttl)
+        return value
+
+def create_store(url):
+    if url == "local://":
+        return LocalStore()
+    if url.startswith("unix://"):
+        return SocketStore(url[len("unix://"):])
+    if url == "redis+local://":
+        return RedisStore(_LocalRedis())
+    if url.startswith(("redis://", "rediss://")):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("SHARED_STATE_URL uses Redis but the 'redis' package is not installed")
+        return RedisStore(redis.Redis.from_url(url))
+    raise ValueError(f"Unsupported SHARED_STATE_URL: {url}")
+
+_store = None
+_store_lock = threading.Lock()
+
+def configure(url):
+    global _store
+    with _store_lock:
+        _store = create_store(url)
+    return _store
+
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = create_store(os.environ.get("SHARED_STATE_URL", DEFAULT_URL))
+    return _store
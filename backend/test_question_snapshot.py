@@ -0,0 +1,149 @@
+import os
+import struct
+import zlib
+
+import pytest
+
+from question_snapshot import (
+    HEADER, HEADER_SIZE, MAGIC, RECORD, SUBJECT, QuestionSnapshot, SnapshotError, TEXT_FIELDS, write_snapshot
+)
+
+def make_question(q_id, subject, answer="A", **fields):
+    q = {
+        "id": q_id, "subject": subject, "correct_option": answer, "year": 2022,
+        "question_text": f"Question {q_id}?", "option_a": "a", "option_b": "b", "option_c": "c", "option_d": "d",
+        "image_path": None, "source_id": f"2022-{q_id}",
+    }
+    q.update(fields)
+    return q
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "bank.qbs")
+
+def test_round_trip_varint_lengths(path):
+    # 1-, 2- and 3-byte varint lengths, multi-byte UTF-8 and an empty (not NULL) string
+    texts = ["x", "y" * 127, "z" * 128, "é" * 5000, "w" * 20000]
+    questions = [make_question(i + 1, "Physics", question_text=t, option_c="") for i, t in enumerate(texts)]
+    assert write_snapshot(path, questions) == (len(texts), 0)
+
+    snapshot = QuestionSnapshot(path, verify=True)
+    assert len(snapshot) == len(texts)
+    for q, record in zip(questions, snapshot):
+        assert record == q
+    snapshot.close()
+
+def test_null_fields_round_trip(path):
+    questions = [
+        make_question(1, "Physics", image_path="/static/images/a.png", source_id=None, year=None),
+        make_question(2, "Physics", **{field: None for field in TEXT_FIELDS}),
+    ]
+    write_snapshot(path, questions)
+
+    snapshot = QuestionSnapshot(path)
+    first, second = snapshot.record(0), snapshot.record(1)
+    assert first["image_path"] == "/static/images/a.png"
+    assert first["source_id"] is None and first["year"] is None
+    assert first["question_text"] == "Question 1?"
+    assert all(second[field] is None for field in TEXT_FIELDS)
+    snapshot.close()
+
+def test_records_are_fixed_width(path):
+    write_snapshot(path, [make_question(1, "Physics", question_text="q" * 1000)])
+    snapshot = QuestionSnapshot(path)
+    assert snapshot._strings_offset - snapshot._records_offset == RECORD.size
+    snapshot.close()
+
+def test_subject_ranges_and_sampling(path):
+    questions = (
+        [make_question(i, "Physics") for i in range(1, 11)]
+        + [make_question(i, "Biology") for i in range(11, 31)]
+        + [make_question(31, None)]
+    )
+    # Input order must not matter; records are grouped by subject
+    write_snapshot(path, list(reversed(questions)))
+
+    snapshot = QuestionSnapshot(path)
+    assert snapshot.subjects == {"": (0, 1), "Biology": (1, 20), "Physics": (21, 10)}
+    for name, (first, count) in snapshot.subjects.items():
+        ids = [snapshot.record(i)["id"] for i in range(first, first + count)]
+        assert ids == sorted(ids)
+        assert {snapshot.record(i)["subject"] for i in range(first, first + count)} == {name}
+
+    picked = snapshot.sample("Physics", 4)
+    assert len(picked) == 4 and len({q["id"] for q in picked}) == 4
+    assert all(q["subject"] == "Physics" for q in picked)
+    assert len(snapshot.sample("Biology", 100)) == 20
+    assert snapshot.sample("Chemistry", 5) == []
+    with pytest.raises(IndexError):
+        snapshot.record(len(snapshot))
+    snapshot.close()
+
+def test_rows_without_valid_answer_are_skipped(path):
+    questions = [
+        make_question(1, "Physics", answer="b"),
+        make_question(2, "Physics", answer=None),
+        make_question(3, "Physics", answer="Both"),
+        make_question(4, "Physics", answer=""),
+    ]
+    assert write_snapshot(path, questions) == (1, 3)
+    snapshot = QuestionSnapshot(path)
+    assert [(q["id"], q["correct_option"]) for q in snapshot] == [(1, "B")]
+    snapshot.close()
+
+def flip_byte(path, position):
+    with open(path, "r+b") as f:
+        f.seek(position)
+        byte = f.read(1)
+        f.seek(position)
+        f.write(bytes([byte[0] ^ 0xFF]))
+
+def test_body_corruption_is_detected(path):
+    write_snapshot(path, [make_question(1, "Physics")])
+    # First byte of the first record's question ID
+    flip_byte(path, HEADER_SIZE + SUBJECT.size)
+
+    snapshot = QuestionSnapshot(path)  # body CRC is opt-in
+    snapshot.close()
+    with pytest.raises(SnapshotError, match="body checksum"):
+        QuestionSnapshot(path, verify=True)
+
+def test_corrupt_subject_name(path):
+    write_snapshot(path, [make_question(1, "Physics")])
+    # Subject names are the last strings in the file
+    flip_byte(path, -3 % os.path.getsize(path))
+    with pytest.raises(SnapshotError):
+        QuestionSnapshot(path)
+
+def test_header_corruption_is_detected(path):
+    write_snapshot(path, [make_question(1, "Physics")])
+    with open(path, "r+b") as f:
+        f.seek(len(MAGIC) + 4)
+        f.write(b"\xff")
+    with pytest.raises(SnapshotError, match="header checksum"):
+        QuestionSnapshot(path)
+
+def test_truncated_file(path):
+    write_snapshot(path, [make_question(1, "Physics")])
+    with open(path, "r+b") as f:
+        f.truncate(HEADER_SIZE + 5)
+    with pytest.raises(SnapshotError, match="truncated"):
+        QuestionSnapshot(path)
+
+@pytest.mark.parametrize("size", [0, 1, HEADER_SIZE - 1])
+def test_too_small_file(path, size):
+    with open(path, "wb") as f:
+        f.write(b"\0" * size)
+    with pytest.raises(SnapshotError, match="too small"):
+        QuestionSnapshot(path)
+
+def test_other_version_is_rejected(path):
+    write_snapshot(path, [make_question(1, "Physics")])
+    with open(path, "r+b") as f:
+        fields = list(HEADER.unpack(f.read(HEADER.size)))
+        fields[1] = 1
+        header = HEADER.pack(*fields)
+        f.seek(0)
+        f.write(header + struct.pack("<I", zlib.crc32(header)))
+    with pytest.raises(SnapshotError, match="unsupported snapshot version 1"):
+        QuestionSnapshot(path)
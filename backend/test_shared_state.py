@@ -0,0 +1,92 @@
+import os
+import stat
+import time
+
+import pytest
+
+from shared_state import LocalStore, RedisStore, SocketStore, _LocalRedis, create_store, default_socket_path
+
+@pytest.fixture(params=["local", "redis", "socket"])
+def store(request, tmp_path):
+    if request.param == "local":
+        return LocalStore()
+    if request.param == "redis":
+        return RedisStore(_LocalRedis())
+    return SocketStore(str(tmp_path / "state.sock"))
+
+def test_get_missing(store):
+    assert store.get("nope") is None
+
+def test_set_get_json_values(store):
+    value = {"id": "abc", "end_time": 1700000000.5, "ids": {"Physics": [1, 2, 3]}, "none": None}
+    store.set("session:abc", value)
+    assert store.get("session:abc") == value
+    store.set("n", 5)
+    assert store.get("n") == 5
+
+def test_delete(store):
+    store.set("k", "v")
+    store.delete("k")
+    store.delete("k")
+    assert store.get("k") is None
+
+def test_incr_returns_and_stores_int(store):
+    assert store.incr("question_bank:version") == 1
+    assert store.incr("question_bank:version", 4) == 5
+    # A counter must read back as a plain JSON value, not break get()
+    assert store.get("question_bank:version") == 5
+
+def test_incr_after_set(store):
+    store.set("counter", 10)
+    assert store.incr("counter") == 11
+    assert store.get("counter") == 11
+
+def test_set_ttl_expires(store):
+    store.set("short", "v", ttl=0.2)
+    store.set("long", "v", ttl=60)
+    assert store.get("short") == "v"
+    time.sleep(0.3)
+    assert store.get("short") is None
+    assert store.get("long") == "v"
+
+def test_incr_ttl_set_on_create_and_kept(store):
+    assert store.incr("c", ttl=0.4) == 1
+    time.sleep(0.2)
+    # Later increments don't push the expiry back
+    assert store.incr("c", ttl=0.4) == 2
+    time.sleep(0.3)
+    assert store.get("c") is None
+    assert store.incr("c") == 1
+
+def test_redis_local_url_survives_invalidate_and_reads():
+    store = create_store("redis+local://")
+    store.set("question_bank:subject_ids", {"version": 0, "ids": {}})
+    store.delete("question_bank:subject_ids")
+    store.incr("question_bank:version")
+    assert store.get("question_bank:version") == 1
+    assert isinstance(store.client.get("question_bank:version"), bytes)
+
+def test_socket_is_private(tmp_path):
+    path = str(tmp_path / "state" / "state.sock")
+    store = SocketStore(path)
+    store.set("k", 1)
+    # Created on first use, closed to other users
+    assert stat.S_IMODE(os.stat(os.path.dirname(path)).st_mode) == 0o700
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+
+def test_socket_in_shared_directory_is_refused(tmp_path):
+    folder = tmp_path / "shared"
+    folder.mkdir()
+    folder.chmod(0o777)
+    store = SocketStore(str(folder / "state.sock"))
+    with pytest.raises(ConnectionError, match="closed to others"):
+        store.get("k")
+    assert not (folder / "state.sock").exists()
+
+def test_default_socket_is_per_user_and_per_directory(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    first = default_socket_path()
+    assert first.startswith(str(tmp_path / "neetmock") + os.sep)
+    monkeypatch.chdir(tmp_path.parent)
+    assert default_socket_path() != first
@@ -7,6 +7,22 @@ import './App.css';
 
 const API_BASE_URL = import.meta.env.VITE_API_BASE_URL || 'https://neetmock.onrender.com';
 
+// Navigation/answer events are sent in batches this often, or sooner once this many are queued
+const EVENT_FLUSH_MS = 30000;
+const EVENT_FLUSH_MAX = 50;
+// Events per request: under the server's 500 and small enough for a keepalive request (64 KB)
+const EVENT_BATCH_MAX = 200;
+
+// When many students start at once the backend answers 503 + Retry-After instead of timing out
+const fetchWithRetry = async (url, options = {}, attempts = 5) => {
+  for (let i = 0; ; i++) {
+    const response = await fetch(url, options);
+    if (response.status !== 503 || i >= attempts - 1) return response;
+    const retryAfter = parseInt(response.headers.get('Retry-After'), 10) || 1;
+    await new Promise((resolve) => setTimeout(resolve, retryAfter * 1000));
+  }
+};
+
 function App() {
   const [gameState, setGameState] = useState('setup'); // setup, test, result
   const [testConfig, setTestConfig] = useState(null);
@@ -22,18 +38,23 @@ function App() {
   const [loading, setLoading] = useState(false);
 
   const timerRef = useRef(null);
+  // Navigation/answer events waiting to be sent in the next batch
+  const pendingEvents = useRef([]);
+  // Events sent but not yet acknowledged; still pending as far as the timers are concerned
+  const inFlightEvents = useRef([]);
+  const flushRequested = useRef(false);
 
   const startTest = async (config) => {
     setLoading(true);
     setTestConfig(config);
     try {
       // 1. Fetch Questions
-      const qResponse = await fetch(`${API_BASE_URL}/api/questions?subject=${config.subject}&duration=${config.duration}`);
+      const qResponse = await fetchWithRetry(`${API_BASE_URL}/api/questions?subject=${config.subject}&duration=${config.duration}`);
       const qData = await qResponse.json();
       setQuestions(qData);
 
       // 2. Start Session on Backend
-      const sResponse = await fetch(`${API_BASE_URL}/api/start-test`, {
+      const sResponse = await fetchWithRetry(`${API_BASE_URL}/api/start-test`, {
         method: 'POST',
         headers: { 'Content-Type': 'application/json' },
         body: JSON.stringify({ duration: config.duration, subject: config.subject })
@@ -76,22 +97,74 @@ function App() {
       ...prev,
       [questionId]: option
     }));
+    queueEvent({ type: 'answer', client_ts: Date.now() / 1000, question_id: questionId, answer: option });
+  };
+
+  const queueEvent = (event) => {
+    pendingEvents.current.push(event);
+    if (pendingEvents.current.length >= EVENT_FLUSH_MAX) flushEvents();
+  };
+
+  // Send queued events as one batch (one DB commit on the server)
+  const flushEvents = async (id = sessionId) => {
+    if (!id || pendingEvents.current.length === 0) return;
+    if (inFlightEvents.current.length > 0) {
+      // One batch at a time, so a retried batch can't land after a newer one
+      flushRequested.current = true;
+      return;
+    }
+    // A backlog left by failed flushes goes out in several requests, oldest first
+    const events = pendingEvents.current.slice(0, EVENT_BATCH_MAX);
+    pendingEvents.current = pendingEvents.current.slice(EVENT_BATCH_MAX);
+    const backlog = pendingEvents.current.length > 0;
+    inFlightEvents.current = events;
+    let sent = false;
+    try {
+      const response = await fetch(`${API_BASE_URL}/api/session-events`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({ session_id: id, sent_at: Date.now() / 1000, events }),
+        keepalive: true
+      });
+      sent = response.ok;
+      if (!sent) console.error("Event flush rejected", response.status);
+    } catch (e) {
+      console.error("Event flush failed", e);
+    } finally {
+      inFlightEvents.current = [];
+      // Put them back so the next flush retries
+      if (!sent) pendingEvents.current = events.concat(pendingEvents.current);
+    }
+    if (sent && (flushRequested.current || backlog)) {
+      flushRequested.current = false;
+      flushEvents(id);
+    }
   };
 
+  // Until queued navigation reaches the server, its question timer is for an older question
+  const navigationPending = () =>
+    pendingEvents.current.some(e => e.type === 'navigate') ||
+    inFlightEvents.current.some(e => e.type === 'navigate');
+
   // Sync Status from Backend
   const syncStatus = async () => {
     if (!sessionId) return;
+    const pendingAtRequest = navigationPending();
     try {
       const response = await fetch(`${API_BASE_URL}/api/test-status/${sessionId}`);
       if (response.ok) {
         const data = await response.json();
         setGlobalTimeLeft(Math.floor(data.remaining_exam_seconds));
-        setQuestionTimeLeft(Math.floor(data.remaining_question_seconds));
 
         if (!data.is_active || data.remaining_exam_seconds <= 0) {
           finishTest();
+          return;
         }
 
+        // Skip the question timer if navigation was unsent when this status was read, or is now
+        if (pendingAtRequest || navigationPending()) return;
+        setQuestionTimeLeft(Math.floor(data.remaining_question_seconds));
+
         // Handle Question Auto-Move? 
         // If backend says question time is 0, we should move next?
         if (data.remaining_question_seconds <= 0) {
@@ -123,25 +196,35 @@ function App() {
     // Sync with server every 5 seconds
     const syncInterval = setInterval(syncStatus, 5000);
 
+    // Send queued navigation/answer events in batches
+    const flushInterval = setInterval(() => flushEvents(sessionId), EVENT_FLUSH_MS);
+
+    // Don't lose queued events when the tab is hidden or closed (keepalive lets the request finish)
+    const flushOnHide = () => {
+      if (document.visibilityState === 'hidden') flushEvents(sessionId);
+    };
+    const flushOnPageHide = () => flushEvents(sessionId);
+    document.addEventListener('visibilitychange', flushOnHide);
+    window.addEventListener('pagehide', flushOnPageHide);
+
     // Initial Sync
     syncStatus();
 
     return () => {
       clearInterval(interval);
       clearInterval(syncInterval);
+      clearInterval(flushInterval);
+      document.removeEventListener('visibilitychange', flushOnHide);
+      window.removeEventListener('pagehide', flushOnPageHide);
     };
   }, [gameState, sessionId]);
 
-  const updateBackendIndex = async (newIndex) => {
+  const updateBackendIndex = (newIndex) => {
     if (!sessionId) return;
-    try {
-      await fetch(`${API_BASE_URL}/api/update-question-index?session_id=${sessionId}&new_index=${newIndex}`, { method: 'POST' });
-      // Reset local question timer visual immediately to feel responsive
-      setQuestionTimeLeft(60);
-      syncStatus(); // Sync to get exact server time
-    } catch (e) {
-      console.error(e);
-    }
+    // Queued and sent in the next batch instead of one request per click
+    queueEvent({ type: 'navigate', client_ts: Date.now() / 1000, index: newIndex });
+    // Reset local question timer visual immediately to feel responsive
+    setQuestionTimeLeft(60);
   };
 
   // Keyboard Navigation
@@ -183,6 +266,7 @@ function App() {
   };
 
   const finishTest = () => {
+    flushEvents();
     setGameState('result');
     setSessionId(null);
   };
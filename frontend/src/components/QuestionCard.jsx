@@ -4,7 +4,11 @@ import './QuestionCard.css';
 const QuestionCard = ({ question, selectedOption, onSelectOption }) => {
     console.log("Rendering Question:", question);
 
-    const { id, question_text, option_a, option_b, option_c, option_d, image_path, year, subject } = question;
+    const { id, question_text, option_a, option_b, option_c, option_d, image_path, image_srcset, year, subject } = question;
+    const apiBase = import.meta.env.VITE_API_BASE_URL || 'https://neetmock.onrender.com';
+
+    // Prefix each "<url> <width>w" entry of a srcset with the API host
+    const withApiBase = (srcset) => srcset.split(', ').map((entry) => `${apiBase}${entry}`).join(', ');
 
     // Fallback for snake_case vs camelCase if needed
     const getOptionText = (key_snake, key_camel) => {
@@ -43,7 +47,12 @@ const QuestionCard = ({ question, selectedOption, onSelectOption }) => {
                 <p className="question-text">{question_text}</p>
                 {image_path && (
                     <div className="question-image">
-                        <img src={`${import.meta.env.VITE_API_BASE_URL || 'https://neetmock.onrender.com'}${image_path}`} alt="Question Diagram" />
+                        <picture>
+                            {image_srcset && Object.entries(image_srcset).map(([type, srcset]) => (
+                                <source key={type} type={type} srcSet={withApiBase(srcset)} sizes="(max-width: 768px) 100vw, 640px" />
+                            ))}
+                            <img src={`${apiBase}${image_path}`} alt="Question Diagram" loading="lazy" />
+                        </picture>
                     </div>
                 )}
             </div>